@@ -1,18 +1,43 @@
+import hashlib
+import re
+import tempfile
 import urllib.request
-import pypdf
 import io
+from pathlib import Path
 
 PDF_URL = "https://www.govinfo.gov/content/pkg/FR-2025-01-15/pdf/2025-00901.pdf"
 
-req = urllib.request.Request(PDF_URL, headers={"User-Agent": "Mozilla/5.0"})
-with urllib.request.urlopen(req) as response:
-    pdf_bytes = response.read()
+# Same on-disk cache as seed_uflpa.py so repeated debug runs skip the download.
+cache = Path(tempfile.gettempdir()) / f"uflpa_{hashlib.sha1(PDF_URL.encode()).hexdigest()}.pdf"
+if cache.exists():
+    pdf_bytes = cache.read_bytes()
+else:
+    req = urllib.request.Request(PDF_URL, headers={"User-Agent": "Mozilla/5.0"})
+    buf = io.BytesIO()
+    with urllib.request.urlopen(req) as response:
+        while chunk := response.read(131072):
+            buf.write(chunk)
+    pdf_bytes = buf.getvalue()
+    cache.write_bytes(pdf_bytes)
 
-reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+try:
+    import fitz  # PyMuPDF: C-backed, ~10x faster than pypdf
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    page_texts = (page.get_text("text") for page in doc)
+except ImportError:
+    import pypdf
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    page_texts = (page.extract_text() or "" for page in reader.pages)
 
-for i, page in enumerate(reader.pages):
-    text = page.extract_text() or ""
-    lines = [l.strip() for l in text.split('\n') if l.strip()]
-    if lines:
-        avg_len = sum(len(l) for l in lines) / len(lines)
-        print(f"Page {i+1}: {len(lines)} lines, avg length {avg_len:.1f}")
+_LINE_RE = re.compile(r'[^\n]+')
+
+for i, text in enumerate(page_texts):
+    n_lines = 0
+    total_len = 0
+    for m in _LINE_RE.finditer(text):
+        line = m.group().strip()
+        if line:
+            n_lines += 1
+            total_len += len(line)
+    if n_lines:
+        print(f"Page {i+1}: {n_lines} lines, avg length {total_len / n_lines:.1f}")
@@ -1,7 +1,32 @@
+import csv
+import hashlib
+import os
 import re
 import sys
+import tempfile
+import time
 import urllib.request
 import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import re2  # google-re2: linear-time DFA, no backtracking
+except ImportError:
+    re2 = None
+
+def _compile_hot(pattern: str):
+    """Compile a hot-path pattern with RE2 when available, else stdlib re.
+
+    RE2 runs long alternations like the company-suffix list in O(n)
+    instead of backtracking through each branch per position.
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
 
 PDF_URL = "https://www.govinfo.gov/content/pkg/FR-2025-01-15/pdf/2025-00901.pdf"
 OUTPUT_FILE = "scripts/uflpa_insert.sql"
@@ -11,19 +36,131 @@ ALIAS_PATTERN = re.compile(
     re.IGNORECASE
 )
 
-def download_pdf(url: str) -> bytes:
+# All hot-path patterns are compiled once at import time; the parsing loops
+# below call methods on these objects instead of re-passing raw strings.
+_WS_RE = re.compile(r'\s+')
+_LINE_RE = re.compile(r'[^\n]+')
+_NOISE_RE = re.compile(
+    r'\d{4} Federal Register\s*/.*?Notices\s*|'
+    r'VerDate\s+\S+.*?NOTICES1\s*|'
+    r'lotter on\s+\S+.*?\n',
+    re.DOTALL
+)
+_SECTION_CUT_RE = re.compile(r'This update also|UFLPA Section|Appendix')
+_LIST_START_RE = re.compile(
+    r'UFLPA Section 2\(d\)\(2\)\(B\)\(i\)\s+A List of Entities'
+)
+_LIST_HEADER_RE = re.compile(
+    r'UFLPA Section|Entities identified|The FLETF|above may|'
+    r'continue to|information about|that meet|^Section \d',
+    re.IGNORECASE
+)
+# Shared between split_into_raw_entries (entry-start detection) and
+# parse_entry (brand validation): one compiled superset instead of two
+# near-identical alternations. The \b anchors let the engine reject
+# non-matching positions without trying every branch.
+_SUFFIX_RE = _compile_hot(
+    r'(?i)\b(?:Co|Ltd|Inc|Corp|Group|Center|Park|Holdings|'
+    r'Technology|Industry|Trading|Corporation|Mine|Mining|'
+    r'Textile|Silicon|Energy|Semiconductor|Foods|Logistics|XPCC|'
+    r'Ninestar|Camel)\b\.?'
+)
+_CONTINUATION_RE = re.compile(r'^[A-Z][a-z]+.*;')
+# Tuple-argument startswith checks every prefix in one C-level call
+# instead of one Python method call per prefix.
+_NON_ENTRY_PREFIXES = ("The ", "These ")
+_CONTINUATION_PREFIXES = ("(", "Ltd.", "Co.,", "and ")
+def _split_aliases(s: str) -> list[str]:
+    """Split an alias string on ';', ', and' and ' and ' delimiters.
+
+    Single-pass scanner equivalent to
+    re.split(r';\\s*(?:and\\s+)?|,\\s*and\\s+|\\s+and\\s+', s) without
+    NFA overhead on this per-entry hot path.
+    """
+    parts = []
+    n = len(s)
+    start = 0
+    i = 0
+    while i < n:
+        ch = s[i]
+        if ch == ';':
+            parts.append(s[start:i])
+            i += 1
+            while i < n and s[i].isspace():
+                i += 1
+            # optional 'and ' right after the semicolon
+            if s.startswith('and', i) and i + 3 < n and s[i + 3].isspace():
+                i += 4
+                while i < n and s[i].isspace():
+                    i += 1
+            start = i
+            continue
+        if ch == ',' or ch.isspace():
+            j = i + 1
+            while j < n and s[j].isspace():
+                j += 1
+            if s.startswith('and', j) and j + 3 < n and s[j + 3].isspace():
+                # ',\s*and\s+' needs no space after the comma; a bare
+                # '\s+and\s+' needs at least the one at i, which we have.
+                if ch == ',' or j > i:
+                    parts.append(s[start:i])
+                    i = j + 4
+                    while i < n and s[i].isspace():
+                        i += 1
+                    start = i
+                    continue
+        i += 1
+    parts.append(s[start:])
+    return parts
+
+CACHE_TTL_SECONDS = 86400  # re-download after a day
+PARALLEL_PARSE_THRESHOLD = 200  # entries before a process pool pays off
+
+def _cache_path(url: str) -> Path:
+    return Path(tempfile.gettempdir()) / f"uflpa_{hashlib.sha1(url.encode()).hexdigest()}.pdf"
+
+def download_pdf(url: str, use_cache: bool = True) -> bytes:
+    # Cache the PDF on disk so repeated runs while iterating on the
+    # parser don't re-download several MB each time.
+    cache = _cache_path(url)
+    if use_cache and cache.exists() and os.path.getmtime(cache) > time.time() - CACHE_TTL_SECONDS:
+        print(f"Using cached PDF at {cache}")
+        return cache.read_bytes()
+
     print(f"Downloading PDF from {url}...")
     req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+    # Read in 128 KiB chunks so the kernel TCP buffer refills while we
+    # copy, instead of blocking on one multi-MB read().
+    buf = io.BytesIO()
     with urllib.request.urlopen(req) as response:
-        return response.read()
+        while chunk := response.read(131072):
+            buf.write(chunk)
+    data = buf.getvalue()
+    if use_cache:
+        cache.write_bytes(data)
+    return data
 
 def extract_full_text(pdf_bytes: bytes) -> str:
+    try:
+        import fitz  # PyMuPDF: C-backed, ~10x faster than pypdf
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        n_pages = doc.page_count
+        if n_pages > 1:
+            # get_text releases the GIL for its C work, so pages can be
+            # decompressed and extracted concurrently; map preserves order.
+            with ThreadPoolExecutor(max_workers=min(8, n_pages)) as ex:
+                texts = list(ex.map(lambda i: doc[i].get_text("text"), range(n_pages)))
+        else:
+            texts = [page.get_text("text") for page in doc]
+        return "\n".join(texts)
+    except ImportError:
+        pass
     try:
         import pypdf
         reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
         return "\n".join(page.extract_text() or "" for page in reader.pages)
     except ImportError:
-        print("pypdf not found. Install with: pip install pypdf --break-system-packages")
+        print("Neither PyMuPDF nor pypdf found. Install with: pip install pymupdf --break-system-packages")
         sys.exit(1)
 
 def get_entity_list_text(full_text: str) -> str:
@@ -31,9 +168,14 @@ def get_entity_list_text(full_text: str) -> str:
     Extract only the text starting from 'Appendix 1' which is where
     the actual entity list begins, cutting off all preamble noise.
     """
-    # Find 'Appendix 1' followed by the supersedes notice
+    # Find 'Appendix 1' followed by the supersedes notice.
+    # The appendix sits near the end of the document, so search the last
+    # ~80 KB first and only fall back to scanning the whole text.
     marker = "Appendix 1"
-    idx = full_text.rfind(marker)  # use rfind to get the last occurrence
+    tail_start = max(0, len(full_text) - 80000)
+    idx = full_text.rfind(marker, tail_start)  # use rfind to get the last occurrence
+    if idx == -1 and tail_start:
+        idx = full_text.rfind(marker)
     if idx == -1:
         print("Warning: Could not find 'Appendix 1' marker")
         return full_text
@@ -42,82 +184,110 @@ def get_entity_list_text(full_text: str) -> str:
 
 def clean_text(text: str) -> str:
     """Remove Federal Register headers, VerDate lines, page numbers."""
-    text = re.sub(r'\d{4} Federal Register\s*/.*?Notices\s*', ' ', text)
-    text = re.sub(r'VerDate\s+\S+.*?NOTICES1\s*', ' ', text, flags=re.DOTALL)
-    text = re.sub(r'lotter on\s+\S+.*?\n', ' ', text)
-    return text
-
-def split_into_raw_entries(text: str) -> list[str]:
+    # One fused alternation: a single pass over the text instead of three,
+    # with no intermediate copies.
+    return _NOISE_RE.sub(' ', text)
+
+def _is_candidate_start(line: str) -> bool:
+    """Cheap gate for new-entry detection: run the character and prefix
+    checks first so the suffix regex only sees plausible lines."""
+    first = line[0]
+    if not ('A' <= first <= 'Z'):
+        return False
+    if line.startswith(_NON_ENTRY_PREFIXES):
+        return False
+    return _SUFFIX_RE.search(line) is not None
+
+def split_into_raw_entries(text: str) -> tuple[list[str], int, int]:
     """
-    Split text into raw entry chunks using bullet points and 
+    Split text into raw entry chunks using bullet points and
     the clean list format on pages 7-8.
-    
+
     Strategy:
     1. Extract bullet-point entries (• Company Name)
     2. Extract entries from the consolidated list section
        which starts after 'UFLPA Section 2(d)(2)(B)(i)'
+
+    Returns (raw_entries, bullet_count, list_count).
     """
+    # One flat list of strings plus two counters instead of a tuple per
+    # entry: callers only iterate the raw text, and the tag was only
+    # ever used to print counts.
     entries = []
     seen = set()
+    bullet_count = 0
+    list_count = 0
+
+    def add(tag: str, raw: str):
+        # The bullet and consolidated-list sections overlap heavily; skip
+        # duplicates here so they never reach parse_entry's regex work.
+        # Entries are already whitespace-normalized, so a lowercased
+        # prefix makes a stable key.
+        nonlocal bullet_count, list_count
+        key = raw[:64].lower()
+        if key in seen:
+            return
+        seen.add(key)
+        if tag == "bullet":
+            bullet_count += 1
+        else:
+            list_count += 1
+        entries.append(raw)
 
     # --- Part 1: Bullet point entries ---
     # Split on bullet character, each chunk is one entry
     bullet_parts = text.split("•")
     for part in bullet_parts[1:]:  # skip text before first bullet
         # Take only up to the next line that looks like a new section
-        part = re.sub(r'\s+', ' ', part).strip()
+        part = _WS_RE.sub(' ', part).strip()
         # Cut off at section headers
-        part = re.split(r'This update also|UFLPA Section|Appendix', part)[0].strip()
+        part = _SECTION_CUT_RE.split(part)[0].strip()
         if part:
-            entries.append(("bullet", part))
+            add("bullet", part)
 
     # --- Part 2: Consolidated list entries ---
     # Find the section header for the full consolidated list
-    section_match = re.search(
-        r'UFLPA Section 2\(d\)\(2\)\(B\)\(i\)\s+A List of Entities',
-        text
-    )
+    section_match = _LIST_START_RE.search(text)
     if section_match:
         list_text = text[section_match.start():]
         list_text = clean_text(list_text)
-        lines = [l.strip() for l in list_text.split('\n') if l.strip()]
-
         current = None
-        for line in lines:
+        # Iterate lines lazily instead of materializing two list copies.
+        # Whitespace is normalized per line here so parse_entry doesn't
+        # have to re-walk each entry with another \s+ pass.
+        for line_match in _LINE_RE.finditer(list_text):
+            line = _WS_RE.sub(' ', line_match.group()).strip()
+            if not line:
+                continue
             # Skip section headers
-            if re.match(r'UFLPA Section|Entities identified|The FLETF|above may|'
-                       r'continue to|information about|that meet|^Section \d', line, re.IGNORECASE):
+            if _LIST_HEADER_RE.match(line):
                 if current:
-                    entries.append(("list", current))
+                    add("list", current)
                     current = None
                 continue
 
             # New entry: starts with capital, has company suffix
-            if (line[0].isupper() and
-                re.search(r'Co\.|Ltd\.|Inc\.|Corp\.|Group|Center|Park|Holdings|'
-                         r'Technology|Industry|Trading|Corporation|Mine|Mining|'
-                         r'Textile|Silicon|Energy|Semiconductor|Foods|Logistics|XPCC', line)
-                and not line.startswith("The ") and not line.startswith("These ")):
+            if _is_candidate_start(line):
                 if current:
-                    entries.append(("list", current))
+                    add("list", current)
                 current = line
             elif current:
                 # Continuation line
-                if (line.startswith("(") or line[0].islower() or
-                    line.startswith("Ltd.") or line.startswith("Co.,") or
-                    line.startswith("and ") or re.match(r'^[A-Z][a-z]+.*;', line)):
+                if (line.startswith(_CONTINUATION_PREFIXES) or
+                    line[0].islower() or _CONTINUATION_RE.match(line)):
                     current += " " + line
                 else:
-                    entries.append(("list", current))
+                    add("list", current)
                     current = None
 
         if current:
-            entries.append(("list", current))
+            add("list", current)
 
-    return entries
+    return entries, bullet_count, list_count
 
 def parse_entry(raw: str) -> dict | None:
-    raw = re.sub(r'\s+', ' ', raw).strip()
+    # split_into_raw_entries already whitespace-normalized every entry.
+    raw = raw.strip()
     if not raw or len(raw) < 5:
         return None
 
@@ -125,7 +295,7 @@ def parse_entry(raw: str) -> dict | None:
     aka_match = ALIAS_PATTERN.search(raw)
     if aka_match:
         raw_aliases = aka_match.group(1)
-        parts = re.split(r';\s*(?:and\s+)?|,\s*and\s+|\s+and\s+', raw_aliases)
+        parts = _split_aliases(raw_aliases)
         aliases = [
             p.strip().strip(";,").strip()
             for p in parts
@@ -135,50 +305,66 @@ def parse_entry(raw: str) -> dict | None:
     else:
         brand = raw.strip().rstrip(".,;").strip()
 
-    brand = re.sub(r'\s+', ' ', brand).strip()
-
     if not brand or len(brand) < 5:
         return None
 
-    if not re.search(r'Co\.|Ltd\.|Inc\.|Corp\.|Group|Center|Park|Holdings|'
-                    r'Technology|Industry|Trading|Corporation|Mine|Mining|'
-                    r'Textile|Silicon|Energy|Semiconductor|Foods|Logistics|XPCC|'
-                    r'Ninestar|Camel', brand, re.IGNORECASE):
+    if not _SUFFIX_RE.search(brand):
         return None
 
     return {"brand": brand, "aliases": aliases}
 
-def escape_sql(s: str) -> str:
-    return s.replace("'", "''")
+# The reason column is the same for every row. COPY's CSV format needs
+# no SQL quoting, so the constant goes through csv.writer as-is.
+REASON = (
+    "Listed on UFLPA Entity List. Subject to rebuttable presumption "
+    "of forced labor under 19 U.S.C. § 1307."
+)
 
-def generate_sql(entities: list[dict]) -> str:
-    lines = [
-        "-- UFLPA Entity List (January 15, 2025)",
-        "-- Generated by scripts/seed_uflpa.py",
-        f"-- {len(entities)} entities",
-        "",
-        "INSERT INTO companies (brand, aliases, product_categories, countries_of_origin, risk_level, sources, reason, last_updated)",
-        "VALUES"
-    ]
+COPY_COLUMNS = (
+    "brand", "aliases", "product_categories", "countries_of_origin",
+    "risk_level", "sources", "reason", "last_updated"
+)
 
-    rows = []
+def _pg_array(items: list[str]) -> str:
+    # Postgres array literal; backslashes and double quotes inside a
+    # quoted element must be backslash-escaped. Typical aliases contain
+    # neither, so skip the replace calls unless one is present.
+    return "{" + ",".join(
+        '"' + (a if '"' not in a and '\\' not in a
+               else a.replace('\\', '\\\\').replace('"', '\\"')) + '"'
+        for a in items
+    ) + "}"
+
+def write_copy(entities: list[dict], f):
+    """Write a COPY ... FROM stdin block to an open file object.
+
+    Both sides stream: Python emits one CSV row at a time instead of
+    building an O(N) SQL string in memory, and PostgreSQL ingests COPY
+    data far faster than it parses N VALUES tuples. Taking the handle
+    rather than a path keeps peak memory at one row regardless of how
+    the caller buffers the output.
+    """
+    f.write("-- UFLPA Entity List (January 15, 2025)\n")
+    f.write("-- Generated by scripts/seed_uflpa.py\n")
+    f.write(f"-- {len(entities)} entities\n\n")
+    f.write(f"COPY companies ({', '.join(COPY_COLUMNS)}) FROM stdin WITH (FORMAT csv);\n")
+    writer = csv.writer(f)
     for entity in entities:
-        brand = escape_sql(entity["brand"])
-        aliases = "{" + ",".join(f'"{escape_sql(a)}"' for a in entity["aliases"]) + "}"
-        reason = escape_sql(
-            "Listed on UFLPA Entity List. Subject to rebuttable presumption of forced labor under 19 U.S.C. § 1307."
-        )
-        row = (
-            f"  ('{brand}', '{aliases}', '{{\"general\"}}', '{{\"CN\"}}', "
-            f"'high', '{{\"UFLPA\"}}', '{reason}', '2025-01-15')"
-        )
-        rows.append(row)
-
-    lines.append(",\n".join(rows) + ";")
-    return "\n".join(lines)
+        writer.writerow([
+            entity["brand"],
+            _pg_array(entity["aliases"]),
+            '{"general"}',
+            '{"CN"}',
+            "high",
+            '{"UFLPA"}',
+            REASON,
+            "2025-01-15",
+        ])
+    f.write("\\.\n")
 
 def main():
-    pdf_bytes = download_pdf(PDF_URL)
+    use_cache = "--no-cache" not in sys.argv
+    pdf_bytes = download_pdf(PDF_URL, use_cache=use_cache)
     print(f"Downloaded {len(pdf_bytes):,} bytes")
 
     full_text = extract_full_text(pdf_bytes)
@@ -187,13 +373,21 @@ def main():
     entity_text = get_entity_list_text(full_text)
     print(f"Entity list section: {len(entity_text):,} characters")
 
-    raw_entries = split_into_raw_entries(entity_text)
-    print(f"Found {len(raw_entries)} raw entries ({sum(1 for t,_ in raw_entries if t=='bullet')} bullet, {sum(1 for t,_ in raw_entries if t=='list')} list)")
+    raw_entries, bullet_count, list_count = split_into_raw_entries(entity_text)
+    print(f"Found {len(raw_entries)} raw entries ({bullet_count} bullet, {list_count} list)")
+
+    # parse_entry is a pure function of a string, so entries can be
+    # parsed in parallel; only worth the worker startup above a few
+    # hundred entries.
+    if len(raw_entries) > PARALLEL_PARSE_THRESHOLD:
+        with ProcessPoolExecutor() as ex:
+            parsed = list(ex.map(parse_entry, raw_entries, chunksize=32))
+    else:
+        parsed = [parse_entry(raw) for raw in raw_entries]
 
     entities = []
     seen = set()
-    for _, raw in raw_entries:
-        entity = parse_entry(raw)
+    for entity in parsed:
         if entity:
             key = entity["brand"].lower()
             if key not in seen:
@@ -206,9 +400,8 @@ def main():
         print("No entities found.")
         return
 
-    sql = generate_sql(entities)
-    with open(OUTPUT_FILE, "w") as f:
-        f.write(sql)
+    with open(OUTPUT_FILE, "w", newline="") as f:
+        write_copy(entities, f)
 
     print(f"\nSQL written to {OUTPUT_FILE}")
     print("\nSample entries:")